@@ -0,0 +1,89 @@
+"""
+Tests for the batch_execute tool against a stubbed TrellisClient
+"""
+
+import asyncio
+import threading
+import time
+
+from tests.test_block_updates import make_client
+from trellis_mcp import server
+
+
+def use_stub_client(monkeypatch, handler):
+    """Point the server's shared client at a StubAdapter-backed client."""
+    client, adapter = make_client(handler)
+    monkeypatch.setattr(server, "_client", client)
+    return adapter
+
+
+def echo_path(request):
+    """Answer a request with its URL path."""
+    return 200, {"path": request.path_url.split("?")[0]}
+
+
+def test_results_are_in_call_order_with_errors_inline(monkeypatch):
+    """Test that each call gets its own entry, including unknown tools."""
+    use_stub_client(monkeypatch, echo_path)
+
+    results = asyncio.run(server.batch_execute([
+        {"tool": "get_entities", "args": {}},
+        {"tool": "no_such_tool", "args": {}},
+        {"tool": "get_entity_fields", "args": {"entity_id": "ent_1"}},
+    ]))
+
+    assert results == [
+        {"tool": "get_entities", "result": {"path": "/v1/entities"}},
+        {"tool": "no_such_tool", "error": "Unknown tool: no_such_tool"},
+        {"tool": "get_entity_fields", "result": {"path": "/v1/entities/ent_1/fields"}},
+    ]
+
+
+def test_stop_on_error_skips_calls_not_yet_started(monkeypatch):
+    """Test that later calls are skipped once a call fails."""
+    adapter = use_stub_client(monkeypatch, echo_path)
+
+    results = asyncio.run(server.batch_execute(
+        [
+            {"tool": "no_such_tool"},
+            {"tool": "get_entities"},
+            {"tool": "get_transformations"},
+        ],
+        max_concurrent=1,
+        stop_on_error=True
+    ))
+
+    assert results[0]["error"] == "Unknown tool: no_such_tool"
+    assert [r["error"] for r in results[1:]] == [
+        "Skipped after an earlier call failed"
+    ] * 2
+    assert adapter.requests == []
+
+
+def test_max_concurrent_limits_calls_in_flight(monkeypatch):
+    """Test that no more than max_concurrent calls run at once."""
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def slow_handler(request):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return echo_path(request)
+
+    use_stub_client(monkeypatch, slow_handler)
+
+    results = asyncio.run(server.batch_execute(
+        [
+            {"tool": "get_entity_fields", "args": {"entity_id": f"ent_{i}"}}
+            for i in range(6)
+        ],
+        max_concurrent=2
+    ))
+
+    assert all("result" in r for r in results)
+    assert peak <= 2
@@ -0,0 +1,84 @@
+"""
+Tests for TrellisClient.update_workflow_blocks against a stubbed HTTP adapter
+"""
+
+import json
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from trellis_mcp.trellis_client import TrellisClient, TrellisConfig
+
+
+class StubAdapter(BaseAdapter):
+    """
+    Transport adapter that answers every request with handler(request).
+
+    Headers set on .headers are added to every response.
+    """
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.headers = {}
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        status, body = self.handler(request)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(self.headers)
+        response._content = body if isinstance(body, bytes) else json.dumps(body).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client(handler):
+    """Create a client whose HTTPS requests go to a StubAdapter."""
+    client = TrellisClient(TrellisConfig("key", "wf_1", "proj_1"))
+    adapter = StubAdapter(handler)
+    client._session.mount("https://", adapter)
+    return client, adapter
+
+
+def echo_blocks(request):
+    """Answer a PATCH with the IDs of the blocks it carried."""
+    payload = json.loads(request.body)
+    return 200, {"data": {"blocks": [b["id"] for b in payload["blocks"]]}}
+
+
+def test_update_sends_single_patch():
+    """Test that every block and deletion goes out in one PATCH."""
+    client, adapter = make_client(echo_blocks)
+    blocks = [{"id": f"b{i}"} for i in range(30)]
+
+    result = client.update_workflow_blocks(blocks, ["old_1"])
+
+    assert len(adapter.requests) == 1
+    assert result["data"]["blocks"] == [f"b{i}" for i in range(30)]
+    assert json.loads(adapter.requests[0].body)["deleted_block_ids"] == ["old_1"]
+
+
+def test_patch_is_only_retried_when_rejected_before_processing():
+    """Test that block updates are not replayed after gateway errors."""
+    client = TrellisClient(TrellisConfig("key", "wf_1", "proj_1"))
+    retry = client._session.get_adapter("https://").max_retries
+
+    assert retry.is_retry("PATCH", 429)
+    assert retry.is_retry("PATCH", 503)
+    assert not retry.is_retry("PATCH", 502)
+    assert not retry.is_retry("PATCH", 504)
+    assert retry.is_retry("GET", 502)
+
+
+def test_non_json_response_raises_request_exception():
+    """Test that an empty 2xx body is reported like response.json() would."""
+    client, adapter = make_client(lambda request: (200, b""))
+
+    with pytest.raises(requests.exceptions.JSONDecodeError):
+        client.update_workflow_blocks([{"id": "b0"}])
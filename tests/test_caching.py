@@ -0,0 +1,41 @@
+"""
+Tests for TrellisClient response caching and ETag revalidation
+"""
+
+from tests.test_block_updates import make_client
+
+
+def test_workflow_config_is_revalidated_with_etag():
+    """Test that If-None-Match is sent and a 304 returns the stored body."""
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return 304, b""
+        return 200, {"data": {"blocks": [{"id": "wblock_1"}]}}
+
+    client, adapter = make_client(handler)
+    adapter.headers = {"ETag": '"v1"'}
+
+    first = client.get_workflow_config()
+    client._config_cache.clear()
+    second = client.get_workflow_config()
+
+    assert "If-None-Match" not in adapter.requests[0].headers
+    assert adapter.requests[1].headers["If-None-Match"] == '"v1"'
+    assert second == first == {"data": {"blocks": [{"id": "wblock_1"}]}}
+
+
+def test_editing_a_returned_config_does_not_change_the_cache():
+    """Test that callers get their own copy from both the TTL and ETag caches."""
+    client, adapter = make_client(
+        lambda request: (304, b"") if "If-None-Match" in request.headers
+        else (200, {"data": {"blocks": [{"id": "wblock_1"}]}})
+    )
+    adapter.headers = {"ETag": '"v1"'}
+
+    client.get_workflow_config()["data"]["blocks"].append({"id": "local_edit"})
+    from_ttl_cache = client.get_workflow_config()
+    client._config_cache.clear()
+    from_etag_cache = client.get_workflow_config()
+
+    assert from_ttl_cache == {"data": {"blocks": [{"id": "wblock_1"}]}}
+    assert from_etag_cache == {"data": {"blocks": [{"id": "wblock_1"}]}}
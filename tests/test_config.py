@@ -0,0 +1,57 @@
+"""
+Tests for TrellisConfig and creating a client from an injected config
+"""
+
+import pytest
+from trellis_mcp.trellis_client import TrellisClient, TrellisConfig
+
+
+def test_config_repr_hides_api_key():
+    """Test that printing a config does not leak the API key."""
+    cfg = TrellisConfig("secret-key", "wf_1", "proj_1")
+
+    assert "secret-key" not in repr(cfg)
+    assert "wf_1" in repr(cfg)
+
+
+def test_client_uses_injected_config_without_env(monkeypatch):
+    """Test that a client can be built from a config with no TRELLIS_* env vars."""
+    for name in ("TRELLIS_API_KEY", "TRELLIS_WORKFLOW_ID", "TRELLIS_PROJECT_ID"):
+        monkeypatch.delenv(name, raising=False)
+    cfg = TrellisConfig(
+        "key", "wf_1", "proj_1", cache_ttl=0, base_url="https://trellis.test/v1"
+    )
+
+    client = TrellisClient(cfg)
+
+    assert client.workflow_id == "wf_1"
+    assert client._session.headers["Authorization"] == "key"
+    assert client._session.headers["API-Version"] == TrellisClient.API_VERSION
+    assert client._url_workflow_config == "https://trellis.test/v1/workflows/wf_1/config"
+
+
+def test_client_constants_are_the_config_defaults(monkeypatch):
+    """Test that API_VERSION and BASE_URL apply when the config leaves them unset."""
+    monkeypatch.setattr(TrellisClient, "API_VERSION", "2099-01")
+    monkeypatch.setattr(TrellisClient, "BASE_URL", "https://staging.trellis.test/v1")
+
+    client = TrellisClient(TrellisConfig("key", "wf_1", "proj_1"))
+
+    assert client._session.headers["API-Version"] == "2099-01"
+    assert client._url_workflow_blocks == (
+        "https://staging.trellis.test/v1/workflows/wf_1/blocks"
+    )
+
+
+def test_invalid_cache_ttl_is_rejected(monkeypatch):
+    """Test that a non-numeric TRELLIS_CACHE_TTL raises a clear ValueError."""
+    monkeypatch.setenv("TRELLIS_API_KEY", "key")
+    monkeypatch.setenv("TRELLIS_WORKFLOW_ID", "wf_1")
+    monkeypatch.setenv("TRELLIS_PROJECT_ID", "proj_1")
+    monkeypatch.setenv("TRELLIS_CACHE_TTL", "soon")
+
+    with pytest.raises(ValueError, match="TRELLIS_CACHE_TTL") as excinfo:
+        TrellisConfig.from_env()
+
+    assert excinfo.value.__cause__ is None
+    assert excinfo.value.__suppress_context__
@@ -0,0 +1,65 @@
+"""
+Tests for the server's logging: the rotating file handler and tool argument formatting
+"""
+
+import logging
+
+from trellis_mcp.models import Block
+from trellis_mcp.server import BufferedFileHandler, _format_tool_args
+
+
+def write_records(handler, count, text):
+    """Emit count INFO records with the given text through handler."""
+    for i in range(count):
+        record = logging.LogRecord(
+            "test", logging.INFO, __file__, 0, "%03d %s", (i, text), None
+        )
+        handler.handle(record)
+    handler.close()
+
+
+def test_rotated_files_stay_under_max_bytes(tmp_path):
+    """Test that non-ASCII records are counted in bytes, not characters."""
+    log_file = tmp_path / "server.log"
+    handler = BufferedFileHandler(
+        log_file, maxBytes=2000, backupCount=3, encoding="utf-8", delay=True
+    )
+
+    write_records(handler, 200, "é" * 40)
+
+    files = sorted(tmp_path.iterdir())
+    assert [f.name for f in files] == [
+        "server.log", "server.log.1", "server.log.2", "server.log.3"
+    ]
+    assert all(f.stat().st_size <= 2000 for f in files)
+
+
+def test_size_is_seeded_from_existing_file(tmp_path):
+    """Test that an existing log counts toward the limit when reopened."""
+    log_file = tmp_path / "server.log"
+    log_file.write_bytes(b"x" * 1990 + b"\n")
+    handler = BufferedFileHandler(
+        log_file, maxBytes=2000, backupCount=1, encoding="utf-8", delay=True
+    )
+
+    write_records(handler, 1, "first record after restart")
+
+    assert (tmp_path / "server.log.1").stat().st_size == 1991
+    assert "first record after restart" in log_file.read_text(encoding="utf-8")
+
+
+def test_block_lists_are_logged_as_counts():
+    """Test that validated Block payloads are logged by count, not repr."""
+    blocks = [
+        Block.model_validate({
+            "id": f"trigger_00{i}",
+            "name": "Watch for New Referrals",
+            "type": "trigger",
+            "position": {"x": 100, "y": 100},
+        })
+        for i in range(2)
+    ]
+
+    formatted = _format_tool_args((), {"blocks": blocks, "deleted_block_ids": None})
+
+    assert formatted == "blocks=2, deleted_block_ids=None"
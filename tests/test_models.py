@@ -0,0 +1,33 @@
+"""
+Tests for Trellis workflow block models
+"""
+
+import pytest
+from pydantic import ValidationError
+from trellis_mcp.models import Block
+
+
+def test_block_keeps_unknown_fields():
+    """Test that fields not declared on Block are passed through unchanged."""
+    block = Block.model_validate({
+        "id": "referral_trigger_001",
+        "name": "Watch for New Referrals",
+        "type": "trigger",
+        "position": {"x": 100, "y": 100},
+        "trigger": {"event_name": "new_asset", "entity_id": "entity_123"},
+        "description": "copied from get_workflow_config",
+    })
+    
+    dumped = block.model_dump(exclude_unset=True)
+    
+    assert dumped["description"] == "copied from get_workflow_config"
+    assert "action" not in dumped
+
+
+def test_partial_block_update_is_rejected():
+    """Test that a partial block (which the API rejects with a 422) fails locally."""
+    with pytest.raises(ValidationError):
+        Block.model_validate({
+            "id": "wblock_35WmLblUNPVyNomrenTbffqTtLg",
+            "name": "Updated Name Only",
+        })
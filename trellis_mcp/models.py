@@ -0,0 +1,44 @@
+"""
+Trellis workflow block models.
+
+Used to validate update_workflow_blocks arguments locally, so a malformed
+block fails before a request is made instead of with a 422 from the API.
+"""
+
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Position(BaseModel):
+    """Visual position of a block in the workflow editor."""
+
+    x: int | float
+    y: int | float
+
+
+class Trigger(BaseModel):
+    """Trigger configuration for a trigger block."""
+
+    model_config = ConfigDict(extra="allow")
+
+    event_name: str
+    entity_id: str
+
+
+class Block(BaseModel):
+    """
+    A workflow block to create or update.
+
+    Fields not declared here (e.g. from a block copied out of
+    get_workflow_config) are kept and sent to the API unchanged.
+    """
+
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+    name: str
+    type: Literal["trigger", "action"]
+    position: Position
+    trigger: Optional[Trigger] = None
+    action: Optional[dict[str, Any]] = None
@@ -5,45 +5,241 @@ This server provides tools for Claude Desktop to manipulate Trellis Workflows
 through natural language commands.
 """
 
+import asyncio
+import atexit
+import functools
+import inspect
 import logging
+import logging.handlers
+import os
+import queue
+from contextlib import asynccontextmanager
 from pathlib import Path
 from mcp.server.fastmcp import FastMCP
+from pydantic import BaseModel
+from .models import Block
 from .trellis_client import TrellisClient
 
 
+LOG_DIR = Path.home() / ".trellis_mcp"
+LOG_FILE = LOG_DIR / "server.log"
+
+
+class BufferedFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that writes through a large buffer instead of
+    flushing every record.
+
+    The buffer is flushed every FLUSH_EVERY records, on any WARNING or
+    higher record, and when the handler is flushed or closed.
+
+    The file size is tracked with a running count of encoded bytes written
+    rather than the stock stream.tell(), which would flush the buffer on
+    every record.
+    """
+
+    BUFFER_SIZE = 64 * 1024
+    FLUSH_EVERY = 50
+
+    def __init__(self, filename, mode="a", maxBytes=0, backupCount=0,
+                 encoding=None, delay=False, errors=None):
+        self._pending = 0
+        self._size = 0
+        super().__init__(
+            filename, mode, maxBytes, backupCount, encoding, delay, errors
+        )
+
+    def _open(self):
+        stream = open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def _encoded_size(self, msg):
+        return len(msg.encode(self.encoding or "utf-8", self.errors or "strict"))
+
+    def shouldRollover(self, record):
+        msg = self.format(record) + self.terminator
+        return self._should_rollover(self._encoded_size(msg))
+
+    def _should_rollover(self, size):
+        # Never roll over an empty file, even for a record larger than maxBytes
+        return (
+            self.maxBytes > 0
+            and self._size > 0
+            and self._size + size >= self.maxBytes
+        )
+
+    def doRollover(self):
+        super().doRollover()
+        self._pending = 0
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            size = self._encoded_size(msg)
+            if self._should_rollover(size):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._size += size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+            return
+
+        self._pending += 1
+        if record.levelno >= logging.WARNING or self._pending >= self.FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        super().flush()
+        self._pending = 0
+
+
 # Configure file-based logging
 def setup_logging():
-    """Set up file-based logging for the MCP server."""
-    log_dir = Path.home() / ".trellis_mcp"
-    log_dir.mkdir(exist_ok=True)
-    log_file = log_dir / "server.log"
-    
+    """
+    Set up file-based logging for the MCP server.
+
+    Tool handlers only enqueue log records; a QueueListener thread owns the
+    FileHandler so disk writes never block a tool call.
+
+    Safe to call more than once: if the root logger already has our queue
+    handler, the existing setup is reused instead of adding another file
+    handler (which would write every record twice).
+    """
+    logger = logging.getLogger("trellis_mcp")
+    root = logging.getLogger()
+    if any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers):
+        return logger
+
+    LOG_DIR.mkdir(exist_ok=True)
+
+    # Rotate at ~10 MB keeping five backups; the file is opened on the
+    # first record rather than at import
+    file_handler = BufferedFileHandler(
+        LOG_FILE,
+        maxBytes=10_000_000,
+        backupCount=5,
+        encoding="utf-8",
+        delay=True,
+    )
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    # atexit runs in reverse order: stop the listener so queued records are
+    # handled, then flush whatever is still sitting in the file buffer
+    atexit.register(file_handler.flush)
+    atexit.register(listener.stop)
+
+    # The queue handler only renders the message; file_handler applies the
+    # full line format on the listener thread
     logging.basicConfig(
         level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        format="%(message)s",
         handlers=[
-            logging.FileHandler(log_file),
+            logging.handlers.QueueHandler(log_queue),
         ]
     )
-    
-    logger = logging.getLogger("trellis_mcp")
+
     logger.info("Trellis MCP Server starting...")
     return logger
 
 
 logger = setup_logging()
 
+# Trellis client, created on first use so importing the server does not
+# require credentials or open an HTTP session
+_client = None
+
+
+def _get_client() -> TrellisClient:
+    """Return the shared TrellisClient, creating it on first call."""
+    global _client
+    if _client is None:
+        _client = TrellisClient()
+    return _client
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Close the shared TrellisClient's connection pool on shutdown."""
+    try:
+        yield
+    finally:
+        if _client is not None:
+            _client.close()
+
+
 # Create FastMCP instance
-mcp = FastMCP("trellis-workflows")
+mcp = FastMCP("trellis-workflows", lifespan=lifespan)
+
+
+def _format_tool_args(args: tuple, kwargs: dict) -> str:
+    """Format tool arguments for debug logs, counting payload lists."""
+    def fmt(value):
+        # Lists of objects (blocks, batch calls) can be large; log the count.
+        # Blocks arrive as validated models, batch calls as plain dicts.
+        if (
+            isinstance(value, list)
+            and value
+            and isinstance(value[0], (dict, BaseModel))
+        ):
+            return len(value)
+        return value
+    parts = [repr(fmt(value)) for value in args]
+    parts += [f"{key}={fmt(value)!r}" for key, value in kwargs.items()]
+    return ", ".join(parts)
+
+
+def log_tool(fn):
+    """
+    Log entry, success, and failure of an async MCP tool call.
+    
+    Also dedents the tool's docstring, which FastMCP sends verbatim as the
+    tool description in every list_tools response.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Tool called: %s(%s)", fn.__name__, _format_tool_args(args, kwargs))
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception:
+            logger.exception("Tool %s failed", fn.__name__)
+            raise
+        logger.debug("Tool %s succeeded", fn.__name__)
+        return result
+    wrapper.__doc__ = inspect.cleandoc(fn.__doc__ or "")
+    return wrapper
 
-# Initialize Trellis client
-client = TrellisClient()
 
+# FastMCP awaits coroutine tools on its event loop (a sync tool would be
+# called inline and block it), so each tool is a coroutine that pushes its
+# blocking TrellisClient call off the loop with asyncio.to_thread, letting
+# concurrent tool calls overlap.
 
 # ===== Transformation Tools =====
 
 @mcp.tool()
-def get_transformations() -> dict:
+@log_tool
+async def get_transformations() -> dict:
     """
     Get all transformations in the Trellis project.
     
@@ -62,18 +258,12 @@ def get_transformations() -> dict:
             - params: Operations/schema details (if included)
             - Other metadata
     """
-    logger.info("Tool called: get_transformations")
-    try:
-        result = client.get_transformations()
-        logger.info("Successfully retrieved transformations")
-        return result
-    except Exception as e:
-        logger.error(f"Failed to get transformations: {e}")
-        raise
+    return await asyncio.to_thread(_get_client().get_transformations)
 
 
 @mcp.tool()
-def get_transformation_details(transform_id: str) -> dict:
+@log_tool
+async def get_transformation_details(transform_id: str) -> dict:
     """
     Get detailed operations/schema for a specific transformation.
     
@@ -89,20 +279,36 @@ def get_transformation_details(transform_id: str) -> dict:
             details. The structure includes information about what data
             the transformation extracts and how.
     """
-    logger.info(f"Tool called: get_transformation_details(transform_id={transform_id})")
-    try:
-        result = client.get_transformation_operations(transform_id)
-        logger.info(f"Successfully retrieved details for transform {transform_id}")
-        return result
-    except Exception as e:
-        logger.error(f"Failed to get transformation details: {e}")
-        raise
+    return await asyncio.to_thread(_get_client().get_transformation_operations, transform_id)
+
+
+@mcp.tool()
+@log_tool
+async def get_transformation_details_bulk(transform_ids: list[str]) -> dict:
+    """
+    Get detailed operations/schema for several transformations at once.
+    
+    Prefer this over calling get_transformation_details repeatedly when you
+    need details for more than one transformation; the requests are made
+    concurrently.
+    
+    Args:
+        transform_ids: The IDs of the transformations to get details for
+    
+    Returns:
+        dict: Maps each transform ID to its get_transformation_details
+            response, or to {"error": message} if that lookup failed
+    """
+    return await asyncio.to_thread(
+        _get_client().get_transformation_operations_bulk, transform_ids
+    )
 
 
 # ===== Entity Tools =====
 
 @mcp.tool()
-def get_entities() -> dict:
+@log_tool
+async def get_entities() -> dict:
     """
     Get all entities in the Trellis project.
     
@@ -122,18 +328,12 @@ def get_entities() -> dict:
             - tags: Entity tags/categories
             - Other metadata
     """
-    logger.info("Tool called: get_entities")
-    try:
-        result = client.get_entities()
-        logger.info("Successfully retrieved entities")
-        return result
-    except Exception as e:
-        logger.error(f"Failed to get entities: {e}")
-        raise
+    return await asyncio.to_thread(_get_client().get_entities)
 
 
 @mcp.tool()
-def get_entity_fields(entity_id: str) -> dict:
+@log_tool
+async def get_entity_fields(entity_id: str) -> dict:
     """
     Get fields (columns) for a specific entity.
     
@@ -153,20 +353,35 @@ def get_entity_fields(entity_id: str) -> dict:
             - Field IDs
             - Other field metadata
     """
-    logger.info(f"Tool called: get_entity_fields(entity_id={entity_id})")
-    try:
-        result = client.get_entity_fields(entity_id)
-        logger.info(f"Successfully retrieved fields for entity {entity_id}")
-        return result
-    except Exception as e:
-        logger.error(f"Failed to get entity fields: {e}")
-        raise
+    return await asyncio.to_thread(_get_client().get_entity_fields, entity_id)
+
+
+@mcp.tool()
+@log_tool
+async def get_entity_fields_bulk(entity_ids: list[str]) -> dict:
+    """
+    Get fields (columns) for several entities at once.
+    
+    Prefer this over calling get_entity_fields repeatedly when you need the
+    fields of more than one entity (e.g. a parent entity and its child
+    entities when mapping transformation outputs); the requests are made
+    concurrently.
+    
+    Args:
+        entity_ids: The IDs of the entities to get fields for
+    
+    Returns:
+        dict: Maps each entity ID to its get_entity_fields response, or to
+            {"error": message} if that lookup failed
+    """
+    return await asyncio.to_thread(_get_client().get_entity_fields_bulk, entity_ids)
 
 
 # ===== Workflow Tools =====
 
 @mcp.tool()
-def get_workflow_config() -> dict:
+@log_tool
+async def get_workflow_config() -> dict:
     """
     Get the current workflow configuration including all blocks and edges.
     
@@ -183,19 +398,13 @@ def get_workflow_config() -> dict:
             - edges: Connections between blocks
             - Other metadata
     """
-    logger.info("Tool called: get_workflow_config")
-    try:
-        result = client.get_workflow_config()
-        logger.info("Successfully retrieved workflow config")
-        return result
-    except Exception as e:
-        logger.error(f"Failed to get workflow config: {e}")
-        raise
+    return await asyncio.to_thread(_get_client().get_workflow_config)
 
 
 @mcp.tool()
-def update_workflow_blocks(
-    blocks: list[dict],
+@log_tool
+async def update_workflow_blocks(
+    blocks: list[Block],
     deleted_block_ids: list[str] | None = None
 ) -> dict:
     """
@@ -331,17 +540,117 @@ def update_workflow_blocks(
     Returns:
         dict: API response confirming the update with workflow_id
     """
-    logger.info(f"Tool called: update_workflow_blocks(blocks={len(blocks)}, deleted_block_ids={deleted_block_ids})")
-    try:
-        result = client.update_workflow_blocks(
-            blocks=blocks,
-            deleted_block_ids=deleted_block_ids
-        )
-        logger.info("Successfully updated workflow blocks")
-        return result
-    except Exception as e:
-        logger.error(f"Failed to update workflow blocks: {e}")
-        raise
+    # MCP calls arrive as validated Blocks; batch_execute passes plain dicts
+    blocks = [
+        Block.model_validate(block).model_dump(exclude_unset=True)
+        for block in blocks
+    ]
+    return await asyncio.to_thread(
+        _get_client().update_workflow_blocks,
+        blocks=blocks,
+        deleted_block_ids=deleted_block_ids
+    )
+
+
+# ===== Cache Tools =====
+
+@mcp.tool()
+@log_tool
+async def refresh_cache() -> dict:
+    """
+    Clear cached Trellis data so the next calls fetch fresh results.
+    
+    Transformations, entities, and entity fields are cached for 30 seconds
+    by default, and the workflow config for 5 seconds. Use this tool if
+    something was changed in the Trellis dashboard and you need to see it
+    immediately.
+    
+    Returns:
+        dict: {"cleared": True} once the cache has been emptied
+    """
+    if _client is not None:
+        _client.clear_cache()
+    return {"cleared": True}
+
+
+# ===== Batch Tools =====
+
+# Tools that can be invoked through batch_execute
+TOOLS = {
+    "get_transformations": get_transformations,
+    "get_transformation_details": get_transformation_details,
+    "get_transformation_details_bulk": get_transformation_details_bulk,
+    "get_entities": get_entities,
+    "get_entity_fields": get_entity_fields,
+    "get_entity_fields_bulk": get_entity_fields_bulk,
+    "get_workflow_config": get_workflow_config,
+    "update_workflow_blocks": update_workflow_blocks,
+}
+
+
+@mcp.tool()
+@log_tool
+async def batch_execute(
+    calls: list[dict],
+    max_concurrent: int = 4,
+    stop_on_error: bool = False
+) -> list[dict]:
+    """
+    Run several tool calls in one request, up to max_concurrent at a time.
+    
+    Prefer this over sequential tool calls when you need several independent
+    pieces of information from different tools, e.g. entities,
+    transformations, and the workflow config. For the fields of several
+    entities or details of several transformations, use
+    get_entity_fields_bulk or get_transformation_details_bulk instead.
+    
+    Calls run concurrently, so do not batch calls that depend on each other
+    (e.g. update_workflow_blocks followed by get_workflow_config).
+    
+    Args:
+        calls: List of calls, each as {"tool": <tool name>, "args": {...}}.
+            Supported tools: get_transformations, get_transformation_details,
+            get_transformation_details_bulk, get_entities, get_entity_fields,
+            get_entity_fields_bulk, get_workflow_config,
+            update_workflow_blocks.
+            
+            Example:
+            [
+                {"tool": "get_entities", "args": {}},
+                {"tool": "get_transformations", "args": {}},
+                {"tool": "get_workflow_config", "args": {}}
+            ]
+        max_concurrent: Maximum number of calls running at once (default: 4)
+        stop_on_error: If true, calls that have not started yet are skipped
+            once any call fails (default: false)
+    
+    Returns:
+        list[dict]: One entry per call, in the same order as calls, with:
+            - tool: The tool name
+            - result: The tool's response (if it succeeded)
+            - error: The error message (if it failed or was skipped)
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrent))
+    failed = asyncio.Event()
+    
+    async def run_call(call: dict) -> dict:
+        entry = {"tool": call.get("tool")}
+        async with semaphore:
+            if failed.is_set():
+                entry["error"] = "Skipped after an earlier call failed"
+                return entry
+            try:
+                if entry["tool"] not in TOOLS:
+                    raise ValueError(f"Unknown tool: {entry['tool']}")
+                entry["result"] = await TOOLS[entry["tool"]](**call.get("args", {}))
+            except Exception as e:
+                entry["error"] = str(e)
+                if stop_on_error:
+                    failed.set()
+        return entry
+    
+    return list(await asyncio.gather(*(run_call(call) for call in calls)))
+
 
 def run():
     mcp.run()
@@ -6,141 +6,436 @@ for all Trellis API operations.
 """
 
 import os
+import json
 import logging
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import urlencode
 
 import requests
+from cachetools import TTLCache
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Optional "speedups" extra; fall back to stdlib json
+    orjson = None
 
-load_dotenv()
 logger = logging.getLogger("trellis_mcp.client")
 
+# Default cache lifetime (seconds) for read-only responses
+DEFAULT_CACHE_TTL = 30
 
+# Whether .env has been loaded into the environment (once per process)
+_env_loaded = False
 
-class TrellisClient:
-    """HTTP client for interacting with the Trellis API."""
+
+class _PatchSafeRetry(Retry):
+    """
+    Retry policy that replays PATCH only on 429 and 503.
     
-    # API constants
-    API_VERSION = "2025-03"
-    BASE_URL = "https://enterprise.training.api.runtrellis.com/v1"
+    Those statuses mean the request was turned away before it was handled.
+    A 502/504 or a read timeout can come back after the backend applied the
+    update, and replaying it could duplicate created blocks or fail a
+    delete that already succeeded, so PATCH is left out of allowed_methods
+    (which also governs read-error retries) and only let through here.
+    """
+    
+    PATCH_STATUS_FORCELIST = frozenset([429, 503])
+    
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method.upper() == "PATCH":
+            return status_code in self.PATCH_STATUS_FORCELIST
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+@dataclass(frozen=True, slots=True)
+class TrellisConfig:
+    """Connection settings for a TrellisClient."""
     
-    def __init__(self):
+    # Kept out of repr() so a logged or printed config doesn't leak the key
+    api_key: str = field(repr=False)
+    workflow_id: str
+    project_id: str
+    # Cache lifetime in seconds for read-only responses (0 disables caching)
+    cache_ttl: float = DEFAULT_CACHE_TTL
+    # None uses TrellisClient.API_VERSION / TrellisClient.BASE_URL
+    api_version: Optional[str] = None
+    base_url: Optional[str] = None
+    
+    @classmethod
+    def from_env(cls) -> "TrellisConfig":
         """
-        Initialize the Trellis API client.
-        
-        Loads configuration from environment variables:
+        Build a config from environment variables:
         - TRELLIS_API_KEY: API authentication token
         - TRELLIS_WORKFLOW_ID: ID of the workflow to manipulate
         - TRELLIS_PROJECT_ID: ID of the project to work with
+        - TRELLIS_CACHE_TTL: Optional cache lifetime in seconds for
+          read-only responses (default: 30, 0 disables caching)
+        
+        Variables may also come from a .env file, which is loaded the first
+        time this is called.
         """
-        self.api_key = os.getenv("TRELLIS_API_KEY")
-        self.workflow_id = os.getenv("TRELLIS_WORKFLOW_ID")
-        self.project_id = os.getenv("TRELLIS_PROJECT_ID")
+        global _env_loaded
+        if not _env_loaded:
+            load_dotenv()
+            _env_loaded = True
         
-        if not self.api_key:
+        api_key = os.getenv("TRELLIS_API_KEY")
+        workflow_id = os.getenv("TRELLIS_WORKFLOW_ID")
+        project_id = os.getenv("TRELLIS_PROJECT_ID")
+        
+        if not api_key:
             raise ValueError("TRELLIS_API_KEY environment variable is required")
-        if not self.workflow_id:
+        if not workflow_id:
             raise ValueError("TRELLIS_WORKFLOW_ID environment variable is required")
-        if not self.project_id:
+        if not project_id:
             raise ValueError("TRELLIS_PROJECT_ID environment variable is required")
         
-        logger.info(f"Initialized TrellisClient for project {self.project_id}")
-        logger.info(f"Target workflow: {self.workflow_id}")
+        try:
+            cache_ttl = float(os.getenv("TRELLIS_CACHE_TTL", DEFAULT_CACHE_TTL))
+        except ValueError:
+            raise ValueError("TRELLIS_CACHE_TTL must be a number of seconds") from None
+        
+        return cls(
+            api_key=api_key,
+            workflow_id=workflow_id,
+            project_id=project_id,
+            cache_ttl=cache_ttl,
+        )
+
+
+class TrellisClient:
+    """HTTP client for interacting with the Trellis API."""
     
-    def _get_headers(self) -> dict:
-        """Build request headers with authentication and API version."""
-        return {
-            "Authorization": self.api_key,
+    __slots__ = (
+        "_cfg",
+        "_base_url",
+        "_url_transforms",
+        "_url_entities",
+        "_url_workflow_config",
+        "_url_workflow_blocks",
+        "_default_headers",
+        "_session",
+        "_cache",
+        "_config_cache",
+        "_cache_lock",
+        "_etag_cache",
+    )
+    
+    # API constants, used unless the config overrides them
+    API_VERSION = "2025-03"
+    BASE_URL = "https://enterprise.training.api.runtrellis.com/v1"
+    
+    # Upper bound (seconds) on how long the workflow config is cached. It
+    # expires sooner than other responses since it can also be edited from
+    # the dashboard.
+    WORKFLOW_CONFIG_CACHE_TTL = 5
+    
+    # Maximum requests in flight for the *_bulk methods
+    MAX_BULK_WORKERS = 16
+    
+    def __init__(self, cfg: Optional[TrellisConfig] = None):
+        """
+        Initialize the Trellis API client.
+        
+        Args:
+            cfg: Connection settings (default: TrellisConfig.from_env())
+        """
+        self._cfg = cfg = cfg or TrellisConfig.from_env()
+        cache_ttl = cfg.cache_ttl
+        self._base_url = base_url = cfg.base_url or self.BASE_URL
+        
+        # Full URLs for endpoints that only depend on the config, built once.
+        # The list endpoints' project query never changes either, so it is
+        # encoded here too (same encoding requests produced from params=).
+        self._url_transforms = f"{base_url}/transforms?" + urlencode({
+            "proj_ids": cfg.project_id,
+            "include_transform_params": True,
+        })
+        self._url_entities = f"{base_url}/entities?" + urlencode({
+            "project_id": cfg.project_id,
+        })
+        self._url_workflow_config = (
+            f"{base_url}/workflows/{cfg.workflow_id}/config"
+        )
+        self._url_workflow_blocks = (
+            f"{base_url}/workflows/{cfg.workflow_id}/blocks"
+        )
+        
+        # Authentication and API version headers sent with every request
+        self._default_headers = {
+            "Authorization": cfg.api_key,
             "Content-Type": "application/json",
-            "API-Version": self.API_VERSION,
+            "API-Version": cfg.api_version or self.API_VERSION,
         }
+        
+        # Long-lived session so repeated calls reuse keep-alive connections.
+        # requests negotiates gzip/deflate responses (plus brotli when the
+        # optional "compression" extra is installed) and decodes them.
+        self._session = requests.Session()
+        self._session.headers.update(self._default_headers)
+        # Retry connection errors, rate limits and gateway errors with
+        # exponential backoff, honouring Retry-After. PATCH is only retried
+        # on 429/503 (see _PatchSafeRetry). raise_on_status=False hands the
+        # last error response back so raise_for_status() reports it.
+        retry = _PatchSafeRetry(
+            total=4,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=retry,
+        )
+        self._session.mount("https://", adapter)
+        
+        # Caches hold raw response bodies and decode them on every hit, so
+        # a caller editing a returned dict can't change what others get
+        self._cache = TTLCache(maxsize=128, ttl=cache_ttl)
+        self._config_cache = TTLCache(
+            maxsize=1,
+            ttl=min(self.WORKFLOW_CONFIG_CACHE_TTL, cache_ttl)
+        )
+        self._cache_lock = threading.Lock()
+        # Last ETag and body per URL for conditional (If-None-Match) GETs
+        self._etag_cache: dict[str, tuple[str, bytes]] = {}
+        
+        logger.info("Initialized TrellisClient for project %s", self.project_id)
+        logger.info("Target workflow: %s", self.workflow_id)
+    
+    @property
+    def api_key(self) -> str:
+        """API authentication token."""
+        return self._cfg.api_key
+    
+    @property
+    def workflow_id(self) -> str:
+        """ID of the workflow to manipulate."""
+        return self._cfg.workflow_id
+    
+    @property
+    def project_id(self) -> str:
+        """ID of the project to work with."""
+        return self._cfg.project_id
+    
+    def close(self):
+        """Close the underlying HTTP session and its pooled connections."""
+        self._session.close()
+    
+    def clear_cache(self):
+        """Drop all cached responses so the next calls hit the API."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._config_cache.clear()
     
     def _request(
         self,
         method: str,
         endpoint: str,
         timeout: int = 30,
+        revalidate: bool = False,
         **kwargs
     ) -> dict:
         """
-        Make an HTTP request to the Trellis API.
+        Make an HTTP request to the Trellis API and decode the JSON response.
+        
+        Takes the same arguments as _request_content().
+        
+        Returns:
+            Full response JSON as dict
+        
+        Raises:
+            requests.exceptions.RequestException: On network or HTTP errors,
+                or a response body that is not JSON
+        """
+        return self._decode(
+            self._request_content(method, endpoint, timeout, revalidate, **kwargs)
+        )
+    
+    def _decode(self, content: bytes) -> dict:
+        """
+        Decode a JSON response body, with orjson when it is installed.
+        
+        Raises:
+            requests.exceptions.JSONDecodeError: If the body is not JSON (the
+                same exception response.json() raises)
+        """
+        try:
+            if orjson is not None:
+                return orjson.loads(content)
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            logger.error("Invalid JSON response: %s", e)
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from None
+    
+    def _request_content(
+        self,
+        method: str,
+        endpoint: str,
+        timeout: int = 30,
+        revalidate: bool = False,
+        **kwargs
+    ) -> bytes:
+        """
+        Make an HTTP request to the Trellis API and return the raw body.
         
         Args:
             method: HTTP method (GET, POST, PATCH, etc.)
-            endpoint: API endpoint path (e.g., "/transforms")
+            endpoint: API endpoint path (e.g., "/transforms"), or a full URL
+                such as one of the prebuilt self._url_* attributes
             timeout: Request timeout in seconds (default: 30)
-            **kwargs: Additional arguments to pass to requests.request()
+            revalidate: Send the last ETag seen for this URL as
+                If-None-Match and reuse the previous body on a 304
+            **kwargs: Additional arguments to pass to Session.request()
         
         Returns:
-            Full response JSON as dict
+            Response body as bytes
         
         Raises:
             requests.exceptions.RequestException: On network or HTTP errors
         """
-        url = f"{self.BASE_URL}{endpoint}"
-        headers = self._get_headers()
-        
-        # Merge custom headers if provided
-        if "headers" in kwargs:
-            headers.update(kwargs.pop("headers"))
+        if endpoint.startswith(("https://", "http://")):
+            url = endpoint
+        else:
+            url = f"{self._base_url}{endpoint}"
+        logger.debug("%s %s", method, url)
         
-        logger.debug(f"{method} {url}")
+        etag_entry = self._etag_cache.get(url) if revalidate else None
+        if etag_entry is not None:
+            kwargs["headers"] = {
+                **kwargs.get("headers", {}),
+                "If-None-Match": etag_entry[0],
+            }
         
         try:
-            response = requests.request(
+            # Session headers are merged with any custom headers in kwargs
+            response = self._session.request(
                 method=method,
                 url=url,
-                headers=headers,
                 timeout=timeout,
                 **kwargs
             )
             
             # Log response status
-            logger.debug(f"Response status: {response.status_code}")
+            logger.debug("Response status: %s", response.status_code)
             
             # Raise for HTTP errors (4xx, 5xx)
             response.raise_for_status()
             
-            # Return full response JSON
-            return response.json()
+            if response.status_code == 304 and etag_entry is not None:
+                return etag_entry[1]
             
-        except requests.exceptions.HTTPError as e:
-            # Log the error with response body if available
-            error_detail = ""
-            try:
-                error_body = e.response.json()
-                error_detail = f" - {error_body}"
-            except Exception:
-                error_detail = f" - {e.response.text[:200]}"
+            content = response.content
+            if revalidate and "ETag" in response.headers:
+                self._etag_cache[url] = (response.headers["ETag"], content)
+            return content
             
-            logger.error(f"HTTP error: {e}{error_detail}")
+        except requests.exceptions.HTTPError as e:
+            # Log the error with the raw response body. API error payloads
+            # are small JSON and kept whole; anything else (e.g. an HTML
+            # gateway page) is cut to 200 bytes before decoding.
+            if logger.isEnabledFor(logging.ERROR):
+                body = e.response.content
+                if not body.lstrip().startswith((b"{", b"[")):
+                    body = body[:200]
+                logger.error("HTTP error: %s - %s", e, body.decode(errors="replace"))
             raise
             
         except requests.exceptions.Timeout as e:
-            logger.error(f"Request timeout after {timeout}s: {e}")
+            logger.error("Request timeout after %ss: %s", timeout, e)
             raise
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {e}")
+            logger.error("Request failed: %s", e)
             raise
     
+    def _cached_request(
+        self,
+        cache: TTLCache,
+        key: tuple,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> dict:
+        """
+        Return a cached response for key, or make the request and cache it.
+        
+        Args:
+            cache: Cache to read from and store into
+            key: Cache key identifying the request
+            method: HTTP method, passed to _request()
+            endpoint: API endpoint path or full URL, passed to _request()
+            **kwargs: Additional arguments to pass to _request()
+        
+        Returns:
+            Full response JSON as dict, decoded fresh for each call
+        """
+        with self._cache_lock:
+            content = cache.get(key)
+        if content is not None:
+            logger.debug("Cache hit for %s", key)
+            return self._decode(content)
+        
+        content = self._request_content(method, endpoint, **kwargs)
+        result = self._decode(content)
+        with self._cache_lock:
+            cache[key] = content
+        return result
+    
+    def _fetch_bulk(self, fetch: Callable[[str], dict], ids: list) -> dict:
+        """
+        Call fetch for each ID concurrently and collect the results by ID.
+        
+        Args:
+            fetch: Single-ID method to call, e.g. self.get_entity_fields
+            ids: IDs to fetch (duplicates are fetched once)
+        
+        Returns:
+            Dict mapping each ID to its response, or to {"error": message}
+            if that request failed
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        
+        results = {}
+        max_workers = min(len(ids), self.MAX_BULK_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {id_: executor.submit(fetch, id_) for id_ in ids}
+            for id_, future in futures.items():
+                try:
+                    results[id_] = future.result()
+                except Exception as e:
+                    results[id_] = {"error": str(e)}
+        return results
+    
     # ===== Transformation Endpoints =====
     
     def get_transformations(self) -> dict:
         """
         Get all transformations in the project.
         
+        Responses are cached for TRELLIS_CACHE_TTL seconds.
+        
         Returns:
             Full API response containing transformation list
         """
         logger.info("Fetching transformations")
-        return self._request(
+        return self._cached_request(
+            self._cache,
+            ("transformations",),
             "GET",
-            "/transforms",
-            params={
-                "proj_ids": [self.project_id],
-                "include_transform_params": True,
-            }
+            self._url_transforms
         )
     
     def get_transformation_operations(self, transform_id: str) -> dict:
@@ -153,59 +448,100 @@ class TrellisClient:
         Returns:
             Full API response containing transformation operations
         """
-        logger.info(f"Fetching operations for transform {transform_id}")
+        logger.info("Fetching operations for transform %s", transform_id)
         return self._request(
             "GET",
             f"/transforms/{transform_id}/operations"
         )
     
+    def get_transformation_operations_bulk(self, transform_ids: list) -> dict:
+        """
+        Get operations for several transformations concurrently.
+        
+        Args:
+            transform_ids: IDs of the transformations
+        
+        Returns:
+            Dict mapping each transform ID to its operations response, or to
+            {"error": message} if that request failed
+        """
+        logger.info("Fetching operations for %d transforms", len(transform_ids))
+        return self._fetch_bulk(self.get_transformation_operations, transform_ids)
+    
     # ===== Entity Endpoints =====
     
     def get_entities(self) -> dict:
         """
         Get all entities in the project.
         
+        Responses are cached for TRELLIS_CACHE_TTL seconds.
+        
         Returns:
             Full API response containing entity list
         """
         logger.info("Fetching entities")
-        return self._request(
+        return self._cached_request(
+            self._cache,
+            ("entities",),
             "GET",
-            "/entities",
-            params={"project_id": self.project_id}
+            self._url_entities
         )
     
     def get_entity_fields(self, entity_id: str) -> dict:
         """
         Get fields for a specific entity.
         
+        Responses are cached per entity for TRELLIS_CACHE_TTL seconds.
+        
         Args:
             entity_id: ID of the entity
         
         Returns:
             Full API response containing entity fields
         """
-        logger.info(f"Fetching fields for entity {entity_id}")
-        return self._request(
+        logger.info("Fetching fields for entity %s", entity_id)
+        return self._cached_request(
+            self._cache,
+            ("entity_fields", entity_id),
             "GET",
             f"/entities/{entity_id}/fields"
         )
     
+    def get_entity_fields_bulk(self, entity_ids: list) -> dict:
+        """
+        Get fields for several entities concurrently.
+        
+        Args:
+            entity_ids: IDs of the entities
+        
+        Returns:
+            Dict mapping each entity ID to its fields response, or to
+            {"error": message} if that request failed
+        """
+        logger.info("Fetching fields for %d entities", len(entity_ids))
+        return self._fetch_bulk(self.get_entity_fields, entity_ids)
+    
     # ===== Workflow Endpoints =====
     
     def get_workflow_config(self) -> dict:
         """
         Get the current workflow configuration including all blocks.
         
-        Uses the workflow_id from environment variables.
+        Uses the workflow_id from environment variables. Responses are cached
+        for WORKFLOW_CONFIG_CACHE_TTL seconds and dropped after
+        update_workflow_blocks(). After that the request is made with
+        If-None-Match, so an unchanged config comes back as a bodiless 304.
         
         Returns:
             Full API response containing workflow configuration
         """
-        logger.info(f"Fetching config for workflow {self.workflow_id}")
-        return self._request(
+        logger.info("Fetching config for workflow %s", self.workflow_id)
+        return self._cached_request(
+            self._config_cache,
+            ("workflow_config",),
             "GET",
-            f"/workflows/{self.workflow_id}/config"
+            self._url_workflow_config,
+            revalidate=True
         )
     
     def update_workflow_blocks(
@@ -268,10 +604,10 @@ class TrellisClient:
                 deleted_block_ids=["wblock_456", "wblock_789"]
             )
         """
-        logger.info(f"Updating blocks for workflow {self.workflow_id}")
-        logger.debug(f"Blocks to update: {len(blocks)}")
+        logger.info("Updating blocks for workflow %s", self.workflow_id)
+        logger.debug("Blocks to update: %d", len(blocks))
         if deleted_block_ids:
-            logger.debug(f"Blocks to delete: {len(deleted_block_ids)}")
+            logger.debug("Blocks to delete: %d", len(deleted_block_ids))
         
         # Inject workflow_id into each block
         blocks_with_workflow_id = []
@@ -284,8 +620,19 @@ class TrellisClient:
         if deleted_block_ids:
             payload["deleted_block_ids"] = deleted_block_ids
         
-        return self._request(
+        # Content-Type: application/json is already a session header
+        if orjson is not None:
+            body = {"data": orjson.dumps(payload)}
+        else:
+            body = {"json": payload}
+        
+        result = self._request(
             "PATCH",
-            f"/workflows/{self.workflow_id}/blocks",
-            json=payload
-        )
\ No newline at end of file
+            self._url_workflow_blocks,
+            **body
+        )
+        
+        # The cached config no longer reflects the workflow
+        with self._cache_lock:
+            self._config_cache.clear()
+        return result
\ No newline at end of file